@@ -0,0 +1,67 @@
+"""SQLite-backed cache for Spotify API responses that rarely change."""
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+DB_PATH = Path.home() / ".claude" / "tools" / "spotify-cli" / "responses.db"
+
+MINUTE = 60
+HOUR = 3600
+WEEK = 7 * 86400
+
+# Keys client stores per signed-in account; dropped when the account may have changed
+USER_PREFIXES = ("playlists:", "playlist:", "saved_tracks:", "saved_albums:", "top_tracks:", "top_artists:")
+
+
+def _connect() -> sqlite3.Connection:
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=1)
+    conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, ts INTEGER, body BLOB)")
+    return conn
+
+
+def get(key: str, ttl: float) -> Optional[Any]:
+    """Return the cached body for key, or None if missing, expired, or unreadable."""
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute("SELECT ts, body FROM responses WHERE key = ?", (key,)).fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+    if row is None or time.time() - row[0] > ttl:
+        return None
+    return json.loads(row[1])
+
+
+def put(key: str, body: Any):
+    """Store body under key. Failures are ignored — the cache is best-effort."""
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, ts, body) VALUES (?, ?, ?)",
+                (key, int(time.time()), json.dumps(body, ensure_ascii=False).encode()),
+            )
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def get_or_fetch(key: str, ttl: float, fetch: Callable[[], Any]) -> Any:
+    """Return the cached body for key, calling fetch() and storing its result on a miss."""
+    body = get(key, ttl)
+    if body is None:
+        body = fetch()
+        put(key, body)
+    return body
+
+
+def invalidate(*prefixes: str):
+    """Drop every entry whose key starts with one of prefixes."""
+    try:
+        with closing(_connect()) as conn, conn:
+            for prefix in prefixes:
+                conn.execute("DELETE FROM responses WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+    except (sqlite3.Error, OSError):
+        pass
@@ -1,14 +1,19 @@
 """Spotipy wrapper — auth + all API methods."""
 
+from __future__ import annotations
+
 import os
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, List
+from typing import TYPE_CHECKING, Dict, Optional, List
 
-import spotipy
-from spotipy.cache_handler import CacheFileHandler
-from spotipy.oauth2 import SpotifyOAuth
+from . import cache, utils
 
-from . import utils
+# spotipy pulls in requests/urllib3; import it only once a command needs the API
+if TYPE_CHECKING:
+    import requests
+    import spotipy
 
 CACHE_PATH = str(Path.home() / ".claude" / "tools" / "spotify-cli" / ".cache")
 
@@ -26,47 +31,210 @@ SCOPES = ",".join([
     "user-read-recently-played",
 ])
 
+# Concurrent requests per command; stays below the session's pool_maxsize
+_MAX_WORKERS = 4
+
+# How long listings stay cached across invocations. Writes made through sp drop
+# the affected keys; changes made in other apps show up once the TTL runs out.
+# Per-account keys must start with one of cache.USER_PREFIXES so that signing in
+# as someone else clears them.
+_LIBRARY_TTL = 5 * cache.MINUTE  # playlists, playlist contents, saved items
+_TOP_TTL = cache.HOUR
+
+# Most ids Spotify accepts per write request
+_PLAYLIST_BATCH = 100
+_TRACK_BATCH = 50
+_ALBUM_BATCH = 20
+
+# Pull the wrapped object out of saved/playlist/history items ({"added_at": ..., "track": {...}})
+_get_track = itemgetter("track")
+_get_album = itemgetter("album")
+
+_CLIENT: Optional[spotipy.Spotify] = None
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_CURRENT_USER_CACHE: Dict[int, dict] = {}
+_DEVICE_ID_CACHE: Dict[int, str] = {}
+
+
+def _build_session() -> requests.Session:
+    """Keep-alive session shared by every API call in this process."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=3,
+        # Never replay after a read error: the request may already have been applied,
+        # and a repeated POST could add tracks twice or skip twice (as spotipy does)
+        read=False,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return session
+
+
+def _build_http2_session():
+    try:
+        from .http2 import HTTPXSessionAdapter
+    except ImportError:
+        raise SystemExit("SPOTIFY_CLI_HTTP2=1 requires httpx: install spotify-cli[http2]")
+    return HTTPXSessionAdapter()
+
 
 def get_client() -> spotipy.Spotify:
+    global _CLIENT
+    if _CLIENT is not None:
+        return _CLIENT
     client_id = os.environ.get("SPOTIFY_CLIENT_ID")
     client_secret = os.environ.get("SPOTIFY_CLIENT_SECRET")
     redirect_uri = os.environ.get("SPOTIFY_REDIRECT_URI")
     if not all([client_id, client_secret, redirect_uri]):
         raise SystemExit("Missing SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, or SPOTIFY_REDIRECT_URI")
     redirect_uri = utils.normalize_redirect_uri(redirect_uri)
+    import spotipy
+    from spotipy.oauth2 import SpotifyOAuth
+
+    from .token_cache import MemoizedCacheFileHandler
+
     auth_manager = SpotifyOAuth(
         client_id=client_id,
         client_secret=client_secret,
         redirect_uri=redirect_uri,
         scope=SCOPES,
-        cache_handler=CacheFileHandler(cache_path=CACHE_PATH),
+        cache_handler=MemoizedCacheFileHandler(cache_path=CACHE_PATH),
     )
-    return spotipy.Spotify(auth_manager=auth_manager)
+    use_http2 = os.environ.get("SPOTIFY_CLI_HTTP2") == "1"
+    session = _build_http2_session() if use_http2 else _build_session()
+    sp = spotipy.Spotify(auth_manager=auth_manager, requests_session=session)
+    # spotipy silently swaps in its own session for anything it does not accept
+    if sp._session is not session:
+        raise SystemExit("spotipy did not accept the configured HTTP session")
+    _CLIENT = sp
+    return _CLIENT
+
+
+def _current_user(sp: spotipy.Spotify) -> dict:
+    """Fetch the current user profile once per client for the life of the process."""
+    user = _CURRENT_USER_CACHE.get(id(sp))
+    if user is None:
+        user = _CURRENT_USER_CACHE[id(sp)] = sp.current_user()
+    return user
 
 
 def _get_username(sp: spotipy.Spotify) -> str:
-    return sp.current_user()["display_name"]
+    return _current_user(sp)["display_name"]
 
 
 def _get_device_id(sp: spotipy.Spotify) -> Optional[str]:
-    """Get device from current playback state, falling back to devices list."""
+    """Get device from current playback state, falling back to devices list.
+
+    The resolved id is cached per client; see _on_device for invalidation.
+    """
+    cached = _DEVICE_ID_CACHE.get(id(sp))
+    if cached is not None:
+        return cached
+    device_id = None
     playback = sp.current_playback()
     if playback and playback.get("device"):
-        return playback["device"]["id"]
-    devices = sp.devices().get("devices", [])
-    for d in devices:
-        if d.get("is_active"):
-            return d["id"]
-    return None
+        device_id = playback["device"]["id"]
+    else:
+        devices = sp.devices().get("devices", [])
+        device_id = next((d["id"] for d in devices if d.get("is_active")), None)
+    if device_id is not None:
+        _DEVICE_ID_CACHE[id(sp)] = device_id
+    return device_id
+
+
+def _on_device(sp: spotipy.Spotify, action):
+    """Run action(device_id) on the cached device, re-resolving once if it has gone away."""
+    from spotipy import SpotifyException
+
+    try:
+        return action(_get_device_id(sp))
+    except SpotifyException as e:
+        if e.http_status != 404 or _DEVICE_ID_CACHE.pop(id(sp), None) is None:
+            raise
+        return action(_get_device_id(sp))
+
+
+def _cached(key: str, fetch, ttl: float = cache.WEEK):
+    """Return the cached response for key, calling fetch() and storing it on a miss."""
+    return cache.get_or_fetch(key, ttl, fetch)
+
+
+def _page_size(cap: Optional[int], max_page: int) -> int:
+    """Largest page the endpoint allows without fetching past cap."""
+    return max_page if cap is None else max(1, min(cap, max_page))
+
+
+def _paginate(sp: spotipy.Spotify, first_page: dict, cap: Optional[int] = None, unwrap=None):
+    """Yield items from first_page and every following page, stopping after cap items.
+
+    unwrap pulls the wanted object out of each raw item (e.g. _get_track). Items
+    that are, or unwrap to, None (removed or unavailable tracks) are skipped and
+    do not count toward cap, so the caller gets cap real items when they exist.
+    """
+    page = first_page
+    collected = 0
+    while True:
+        for item in page["items"]:
+            if cap is not None and collected >= cap:
+                return
+            if item is not None and unwrap is not None:
+                item = unwrap(item)
+            if item is None:
+                continue
+            yield item
+            collected += 1
+        if not page.get("next") or (cap is not None and collected >= cap):
+            return
+        page = sp.next(page)
+
+
+def _chunked(seq: list, n: int):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Thread pool shared by every concurrent call in this process, created on first use."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_WORKERS)
+    return _EXECUTOR
+
+
+def _run_chunked(fn, ids: List[str], size: int, concurrent: bool = True):
+    """Call fn once per batch of at most `size` ids, concurrently unless order matters."""
+    batches = list(_chunked(ids, size))
+    if len(batches) <= 1 or not concurrent:
+        for batch in batches:
+            fn(batch)
+        return
+    ex = _executor()
+    futures = [ex.submit(fn, batch) for batch in batches]
+    _, pending = wait(futures, return_when=FIRST_EXCEPTION)
+    for f in pending:
+        f.cancel()
+    for f in futures:
+        if not f.cancelled():
+            f.result()
 
 
 # --- Playback ---
 
 def now_playing(sp: spotipy.Spotify) -> Optional[dict]:
     current = sp.current_user_playing_track()
-    if not current or current.get("currently_playing_type") != "track":
+    if not current:
         return None
-    track = utils.parse_track(current["item"])
+    item = current.get("item")
+    # item is null during ads and private sessions even when the type is "track"
+    if item is None or current.get("currently_playing_type") != "track":
+        return None
+    track = utils.parse_track(item)
     track["is_playing"] = current.get("is_playing", False)
     return track
 
@@ -82,13 +250,35 @@ def play(sp: spotipy.Spotify, uri: Optional[str] = None, device_id: Optional[str
 
 
 def pause(sp: spotipy.Spotify):
-    device_id = _get_device_id(sp)
-    sp.pause_playback(device_id=device_id)
+    _on_device(sp, lambda device_id: sp.pause_playback(device_id=device_id))
 
 
 def skip(sp: spotipy.Spotify, n: int = 1):
-    for _ in range(n):
+    """Skip n tracks, jumping straight to the target track when the queue reaches it."""
+    if n < 1:
+        return
+    if n == 1:
         sp.next_track()
+        return
+    from spotipy import SpotifyException
+
+    upcoming = sp.queue().get("queue", [])
+    if len(upcoming) >= n:
+        playback = sp.current_playback() or {}
+        context = playback.get("context")
+        # Without a context, playing the target alone would stop after that one track
+        if context:
+            target = upcoming[n - 1]["uri"]
+            device_id = playback["device"]["id"] if playback.get("device") else _get_device_id(sp)
+            try:
+                # Stay inside the album/playlist so playback continues past the target
+                sp.start_playback(context_uri=context["uri"], offset={"uri": target}, device_id=device_id)
+                return
+            except SpotifyException:
+                pass  # target is not part of the context (e.g. manually queued) — skip one by one
+    # The skips run concurrently over the keep-alive pool. Each one still advances
+    # playback by a track, but the order in which Spotify applies them is not fixed.
+    list(_executor().map(lambda _: sp.next_track(), range(n)))
 
 
 def prev(sp: spotipy.Spotify):
@@ -120,13 +310,31 @@ def queue_add(sp: spotipy.Spotify, uri: str):
 # --- Search ---
 
 def search(sp: spotipy.Spotify, query: str, qtype: str = "track", limit: int = 10) -> dict:
-    username = _get_username(sp)
+    # Only playlist results are labelled with ownership, so skip the profile lookup otherwise
+    username = _get_username(sp) if "playlist" in qtype.split(",") else None
     results = sp.search(q=query, type=qtype, limit=limit)
     return utils.parse_search_results(results, qtype, username)
 
 
 # --- Info ---
 
+def _album_with_all_tracks(sp: spotipy.Spotify, album_id: str) -> dict:
+    """The album object with every track page filled in, not just the first 50."""
+    album = sp.album(album_id)
+    tracks = album["tracks"]
+    if tracks.get("next"):
+        # Offsets are known from the total, so the remaining pages can all go out at once
+        step = tracks["limit"]
+        pages = _executor().map(
+            lambda offset: sp.album_tracks(album_id, limit=step, offset=offset),
+            range(tracks["offset"] + step, tracks["total"], step),
+        )
+        for page in pages:
+            tracks["items"].extend(page["items"])
+        tracks["next"] = None
+    return album
+
+
 def info(sp: spotipy.Spotify, uri: str) -> dict:
     parts = uri.split(":")
     if len(parts) != 3:
@@ -134,121 +342,145 @@ def info(sp: spotipy.Spotify, uri: str) -> dict:
     _, qtype, item_id = parts
     match qtype:
         case "track":
-            return utils.parse_track(sp.track(item_id), detailed=True)
+            track = _cached(f"track:{item_id}", lambda: sp.track(item_id))
+            return utils.parse_track(track, detailed=True)
         case "album":
-            return utils.parse_album(sp.album(item_id), detailed=True)
+            album = _cached(f"album:{item_id}", lambda: _album_with_all_tracks(sp, item_id))
+            return utils.parse_album(album, detailed=True)
         case "artist":
-            artist = utils.parse_artist(sp.artist(item_id), detailed=True)
-            top = sp.artist_top_tracks(item_id)["tracks"]
-            albums = sp.artist_albums(item_id)
+            # Independent requests — issue them together over the pooled session.
+            ex = _executor()
+            f_artist = ex.submit(_cached, f"artist:{item_id}", lambda: sp.artist(item_id))
+            f_top = ex.submit(sp.artist_top_tracks, item_id)
+            f_albums = ex.submit(_cached, f"artist_albums:{item_id}", lambda: sp.artist_albums(item_id))
+            artist = utils.parse_artist(f_artist.result(), detailed=True)
+            top = f_top.result()["tracks"]
+            albums = f_albums.result()
             artist["top_tracks"] = [utils.parse_track(t) for t in top]
             artist["albums"] = [utils.parse_album(a) for a in albums["items"]]
             return artist
         case "playlist":
-            username = _get_username(sp)
-            return utils.parse_playlist(sp.playlist(item_id), username, detailed=True)
+            playlist = _cached(f"playlist:{item_id}:info", lambda: sp.playlist(item_id), _LIBRARY_TTL)
+            return utils.parse_playlist(playlist, _get_username(sp), detailed=True)
     raise ValueError(f"Unknown type: {qtype}")
 
 
 # --- Playlists ---
 
-def playlists(sp: spotipy.Spotify, limit: int = 50) -> list:
-    username = _get_username(sp)
-    results = sp.current_user_playlists(limit=limit)
-    return [utils.parse_playlist(p, username) for p in results["items"]]
+def playlists(sp: spotipy.Spotify, limit: Optional[int] = 50) -> list:
+    """List the user's playlists across pages. limit=None means fetch all."""
+    def fetch():
+        username = _get_username(sp)
+        first = sp.current_user_playlists(limit=_page_size(limit, 50))
+        return [utils.parse_playlist(p, username) for p in _paginate(sp, first, limit)]
+    return _cached(f"playlists:{limit}", fetch, _LIBRARY_TTL)
 
 
 def playlist_tracks(sp: spotipy.Spotify, playlist_id: str, limit: int = 0, offset: int = 0) -> dict:
     """Fetch playlist tracks with pagination. limit=0 means fetch all."""
-    tracks = []
-    batch_size = 100
-    current_offset = offset
-
-    if limit > 0:
-        # Fetch exactly `limit` tracks starting at `offset`
-        while len(tracks) < limit:
-            fetch = min(batch_size, limit - len(tracks))
-            results = sp.playlist_items(playlist_id, limit=fetch, offset=current_offset)
-            items = [utils.parse_track(item["track"]) for item in results["items"] if item.get("track")]
-            tracks.extend(items)
-            if not results.get("next"):
-                break
-            current_offset += fetch
-        total = results.get("total", len(tracks))
-    else:
-        # Fetch all tracks
-        results = sp.playlist_items(playlist_id, limit=batch_size, offset=current_offset)
-        total = results.get("total", 0)
-        items = [utils.parse_track(item["track"]) for item in results["items"] if item.get("track")]
-        tracks.extend(items)
-        while results.get("next"):
-            current_offset += batch_size
-            results = sp.playlist_items(playlist_id, limit=batch_size, offset=current_offset)
-            items = [utils.parse_track(item["track"]) for item in results["items"] if item.get("track")]
-            tracks.extend(items)
+    cap = limit if limit > 0 else None
 
-    return {"tracks": tracks, "total": total, "offset": offset}
+    def fetch():
+        first = sp.playlist_items(playlist_id, limit=_page_size(cap, 100), offset=offset)
+        tracks = list(map(utils.parse_track, _paginate(sp, first, cap, _get_track)))
+        return {"tracks": tracks, "total": first.get("total", len(tracks)), "offset": offset}
+    return _cached(f"playlist:{playlist_id}:tracks:{limit}:{offset}", fetch, _LIBRARY_TTL)
 
 
 def playlist_add(sp: spotipy.Spotify, playlist_id: str, track_ids: List[str]):
-    sp.playlist_add_items(playlist_id, track_ids)
+    # Sequential: each batch is appended, so concurrent requests would shuffle the order
+    try:
+        _run_chunked(lambda batch: sp.playlist_add_items(playlist_id, batch), track_ids, _PLAYLIST_BATCH, concurrent=False)
+    finally:
+        # Also after a partial failure: batches that went through are not rolled back
+        cache.invalidate(f"playlist:{playlist_id}:", "playlists:")
 
 
 def playlist_remove(sp: spotipy.Spotify, playlist_id: str, track_ids: List[str]):
-    sp.playlist_remove_all_occurrences_of_items(playlist_id, track_ids)
+    try:
+        _run_chunked(lambda batch: sp.playlist_remove_all_occurrences_of_items(playlist_id, batch), track_ids, _PLAYLIST_BATCH)
+    finally:
+        cache.invalidate(f"playlist:{playlist_id}:", "playlists:")
 
 
 def playlist_delete(sp: spotipy.Spotify, playlist_id: str):
-    sp.current_user_unfollow_playlist(playlist_id)
+    try:
+        sp.current_user_unfollow_playlist(playlist_id)
+    finally:
+        cache.invalidate(f"playlist:{playlist_id}:", "playlists:")
 
 
 def playlist_create(sp: spotipy.Spotify, name: str, public: bool = True, description: str = "") -> dict:
-    user_id = sp.current_user()["id"]
-    username = _get_username(sp)
+    user = _current_user(sp)
+    user_id, username = user["id"], user["display_name"]
     result = sp.user_playlist_create(user=user_id, name=name, public=public, description=description)
+    cache.invalidate("playlists:")
     return utils.parse_playlist(result, username, detailed=True)
 
 
 # --- Library ---
 
-def saved_tracks(sp: spotipy.Spotify, limit: int = 20) -> list:
-    results = sp.current_user_saved_tracks(limit=limit)
-    return [utils.parse_track(item["track"]) for item in results["items"] if item.get("track")]
+def saved_tracks(sp: spotipy.Spotify, limit: Optional[int] = 20) -> list:
+    """Liked tracks across pages. limit=None means fetch all."""
+    def fetch():
+        first = sp.current_user_saved_tracks(limit=_page_size(limit, 50))
+        return list(map(utils.parse_track, _paginate(sp, first, limit, _get_track)))
+    return _cached(f"saved_tracks:{limit}", fetch, _LIBRARY_TTL)
 
 
-def saved_albums(sp: spotipy.Spotify, limit: int = 20) -> list:
-    results = sp.current_user_saved_albums(limit=limit)
-    return [utils.parse_album(item["album"]) for item in results["items"] if item.get("album")]
+def saved_albums(sp: spotipy.Spotify, limit: Optional[int] = 20) -> list:
+    """Saved albums across pages. limit=None means fetch all."""
+    def fetch():
+        first = sp.current_user_saved_albums(limit=_page_size(limit, 50))
+        return list(map(utils.parse_album, _paginate(sp, first, limit, _get_album)))
+    return _cached(f"saved_albums:{limit}", fetch, _LIBRARY_TTL)
 
 
 def save_tracks(sp: spotipy.Spotify, ids: List[str]):
-    sp.current_user_saved_tracks_add(ids)
+    try:
+        _run_chunked(sp.current_user_saved_tracks_add, ids, _TRACK_BATCH)
+    finally:
+        # Also after a partial failure: batches that went through are not rolled back
+        cache.invalidate("saved_tracks:")
 
 
 def save_albums(sp: spotipy.Spotify, ids: List[str]):
-    sp.current_user_saved_albums_add(ids)
+    try:
+        _run_chunked(sp.current_user_saved_albums_add, ids, _ALBUM_BATCH)
+    finally:
+        cache.invalidate("saved_albums:")
 
 
 def unsave_tracks(sp: spotipy.Spotify, ids: List[str]):
-    sp.current_user_saved_tracks_delete(ids)
+    try:
+        _run_chunked(sp.current_user_saved_tracks_delete, ids, _TRACK_BATCH)
+    finally:
+        cache.invalidate("saved_tracks:")
 
 
 def unsave_albums(sp: spotipy.Spotify, ids: List[str]):
-    sp.current_user_saved_albums_delete(ids)
+    try:
+        _run_chunked(sp.current_user_saved_albums_delete, ids, _ALBUM_BATCH)
+    finally:
+        cache.invalidate("saved_albums:")
 
 
 # --- Listening History ---
 
 def recent(sp: spotipy.Spotify, limit: int = 20) -> list:
     results = sp.current_user_recently_played(limit=limit)
-    return [utils.parse_track(item["track"]) for item in results["items"] if item.get("track")]
+    return list(map(utils.parse_track, filter(None, map(_get_track, results["items"]))))
 
 
 def top_tracks(sp: spotipy.Spotify, time_range: str = "medium_term", limit: int = 20) -> list:
-    results = sp.current_user_top_tracks(limit=limit, time_range=time_range)
-    return [utils.parse_track(t) for t in results["items"]]
+    def fetch():
+        results = sp.current_user_top_tracks(limit=limit, time_range=time_range)
+        return [utils.parse_track(t) for t in results["items"]]
+    return _cached(f"top_tracks:{time_range}:{limit}", fetch, _TOP_TTL)
 
 
 def top_artists(sp: spotipy.Spotify, time_range: str = "medium_term", limit: int = 20) -> list:
-    results = sp.current_user_top_artists(limit=limit, time_range=time_range)
-    return [utils.parse_artist(a) for a in results["items"]]
+    def fetch():
+        results = sp.current_user_top_artists(limit=limit, time_range=time_range)
+        return [utils.parse_artist(a) for a in results["items"]]
+    return _cached(f"top_artists:{time_range}:{limit}", fetch, _TOP_TTL)
@@ -0,0 +1,485 @@
+"""Command handlers — one function per `sp` subcommand."""
+
+from __future__ import annotations
+
+import sys
+from types import MappingProxyType
+
+from . import client, formatters
+
+# Confirmation messages for action commands, pre-encoded for _confirm
+_MSG_PLAYING = b"Playing.\n"
+_MSG_RESUMED = b"Resumed.\n"
+_MSG_PAUSED = b"Paused.\n"
+_MSG_PREV = b"Previous track.\n"
+_MSG_QUEUED = b"Added to queue.\n"
+_MSG_DELETED = b"Deleted playlist.\n"
+_FMT_SKIPPED = b"Skipped %d track(s).\n"
+_FMT_VOLUME = b"Volume: %d%%\n"
+_FMT_ADDED = b"Added %d track(s).\n"
+_FMT_REMOVED = b"Removed %d track(s).\n"
+_FMT_SAVED = b"Saved %d track(s).\n"
+_FMT_SAVED_ALBUMS = b"Saved %d album(s).\n"
+_FMT_REMOVED_ALBUMS = b"Removed %d album(s).\n"
+
+TIME_RANGE_MAP = MappingProxyType({"short": "short_term", "medium": "medium_term", "long": "long_term"})
+
+
+def _time_range(value: str) -> str:
+    return TIME_RANGE_MAP.get(value, "medium_term")
+
+
+def _parse_ids(s: str) -> list:
+    ids = s.split(",")
+    # Agents usually pass a clean "id1,id2,id3": no whitespace (isprintable() rejects
+    # all but the space) and no empty entries, so the split is already the answer.
+    if " " not in s and s.isprintable() and "" not in ids:
+        return ids
+    return [x for x in map(str.strip, ids) if x]
+
+
+def _split_flags(args: list, known: dict, start: int = 0) -> tuple[list, dict]:
+    """Split args[start:] in one pass into positionals and {flag: value} for the flags in known.
+
+    known maps each flag to a converter for its value, or to bool for a switch.
+    Values may follow as the next token or be attached as --flag=value. A value
+    flag at the very end with nothing after it is dropped. A bare "--" ends flag
+    parsing: everything after it is positional. args is only read by index,
+    never mutated.
+    """
+    positional, flags = [], {}
+    i, n = start, len(args)
+    while i < n:
+        tok = args[i]
+        if tok == "--":
+            positional.extend(args[i + 1:])
+            break
+        kind = known.get(tok)
+        if kind is None:
+            name, eq, val = tok.partition("=")
+            kind = known.get(name) if eq and name.startswith("--") else None
+            if kind is None or kind is bool:
+                positional.append(tok)
+            else:
+                flags[name] = _convert(name, kind, val)
+        elif kind is bool:
+            flags[tok] = True
+        else:
+            i += 1
+            if i < n:
+                flags[tok] = _convert(tok, kind, args[i])
+        i += 1
+    return positional, flags
+
+
+def _convert(flag: str, kind, value: str):
+    try:
+        return kind(value)
+    except ValueError:
+        raise ValueError(f"argument {flag}: invalid {getattr(kind, '__name__', 'value')} value: {value!r}") from None
+
+
+def _reject_extra(extra: list):
+    # Commands without free text refuse leftovers instead of silently ignoring typos
+    if extra:
+        raise ValueError(f"unrecognized arguments: {' '.join(extra)}")
+
+
+_LIMIT_FLAGS = {"--limit": int}
+_TOP_FLAGS = {"--range": _time_range, "--limit": int}
+
+
+def _dump_json(result):
+    # formatters_json (and orjson, when installed) load only for --json output
+    from .formatters_json import dump_json
+
+    dump_json(result)
+
+
+def _confirm(msg: bytes):
+    """Write an ASCII confirmation straight to the byte stream, skipping the text encoder."""
+    sys.stdout.flush()  # keep order with anything already printed
+    sys.stdout.buffer.write(msg)
+
+
+def _write_lines(lines):
+    """Emit all lines with one write instead of one print() per line."""
+    text = "\n".join(lines)
+    if text:
+        sys.stdout.write(text + "\n")
+
+
+# --- Playback ---
+
+def _cmd_now(args: list, use_json: bool):
+    result = client.now_playing(client.get_client())
+    if use_json:
+        _dump_json(result)
+    else:
+        print(formatters.format_now_playing(result))
+
+
+_PLAY_FLAGS = {"--device": str}
+
+
+def _cmd_play(args: list, use_json: bool):
+    positional, flags = _split_flags(args, _PLAY_FLAGS)
+    _reject_extra(positional[1:])
+    uri = positional[0] if positional else None
+    client.play(client.get_client(), uri, device_id=flags.get("--device"))
+    _confirm(_MSG_PLAYING if uri else _MSG_RESUMED)
+
+
+def _cmd_pause(args: list, use_json: bool):
+    client.pause(client.get_client())
+    _confirm(_MSG_PAUSED)
+
+
+def _cmd_skip(args: list, use_json: bool):
+    n = int(args[0]) if args else 1
+    client.skip(client.get_client(), n)
+    _confirm(_FMT_SKIPPED % n)
+
+
+def _cmd_prev(args: list, use_json: bool):
+    client.prev(client.get_client())
+    _confirm(_MSG_PREV)
+
+
+def _cmd_volume(args: list, use_json: bool):
+    if not args:
+        print("Usage: sp volume <0-100>", file=sys.stderr)
+        sys.exit(1)
+    level = int(args[0])
+    client.volume(client.get_client(), level)
+    _confirm(_FMT_VOLUME % level)
+
+
+def _cmd_devices(args: list, use_json: bool):
+    result = client.devices(client.get_client())
+    if use_json:
+        _dump_json(result)
+    else:
+        if not result:
+            print("No devices found.")
+        else:
+            _write_lines(map(formatters.format_device, result))
+
+
+# --- Queue ---
+
+def _cmd_queue(args: list, use_json: bool):
+    if args and args[0] == "add":
+        if len(args) < 2:
+            print("Usage: sp queue add <uri>", file=sys.stderr)
+            sys.exit(1)
+        client.queue_add(client.get_client(), args[1])
+        _confirm(_MSG_QUEUED)
+    else:
+        result = client.get_queue(client.get_client())
+        if use_json:
+            _dump_json(result)
+        else:
+            print(formatters.format_queue(result))
+
+
+# --- Search ---
+
+_SEARCH_FLAGS = {"--type": str, "--limit": int}
+
+
+def _cmd_search(args: list, use_json: bool):
+    # Free text: everything but the known flags is the query, even words starting with "-"
+    words, flags = _split_flags(args, _SEARCH_FLAGS)
+    if not words:
+        print("Usage: sp search <query> [--type TYPE] [--limit N]", file=sys.stderr)
+        sys.exit(1)
+    query = words[0] if len(words) == 1 else " ".join(words)
+    result = client.search(client.get_client(), query, flags.get("--type", "track"), flags.get("--limit", 10))
+    if use_json:
+        _dump_json(result)
+    else:
+        print(formatters.format_search_results(result))
+
+
+# --- Info ---
+
+_INFO_FORMATTERS = {
+    "artist": formatters.format_artist_info,
+    "playlist": formatters.format_playlist_detail,
+    "album": formatters.format_album_detail,
+}
+
+
+def _cmd_info(args: list, use_json: bool):
+    if not args:
+        print("Usage: sp info <spotify:type:id>", file=sys.stderr)
+        sys.exit(1)
+    result = client.info(client.get_client(), args[0])
+    if use_json:
+        _dump_json(result)
+    else:
+        # Format based on URI type; client.info has already checked it is spotify:type:id
+        uri = args[0]
+        start = uri.find(":") + 1
+        uri_type = uri[start:uri.find(":", start)]
+        print(_INFO_FORMATTERS.get(uri_type, formatters.format_track)(result))
+
+
+# --- Playlists ---
+
+def _cmd_playlists(args: list, use_json: bool):
+    positional, flags = _split_flags(args, _LIMIT_FLAGS)
+    _reject_extra(positional)
+    result = client.playlists(client.get_client(), flags.get("--limit", 50))
+    if use_json:
+        _dump_json(result)
+    else:
+        _write_lines(f"{i:>3}. {formatters.format_playlist(p)}" for i, p in enumerate(result, 1))
+
+
+_PLAYLIST_FLAGS = {"--limit": int, "--offset": int}
+
+
+def _cmd_playlist(args: list, use_json: bool):
+    if not args:
+        print("Usage: sp playlist <id> [add|remove <ids>]", file=sys.stderr)
+        sys.exit(1)
+    pid = args[0]
+    if pid == "create":
+        _cmd_playlist_create(args[1:], use_json)
+        return
+    if len(args) >= 2 and args[1] == "create":
+        # Redirect: they typed "sp playlist <something> create ..."
+        _cmd_playlist_create(args[2:], use_json)
+        return
+    if len(args) >= 2 and args[1] == "delete":
+        client.playlist_delete(client.get_client(), pid)
+        _confirm(_MSG_DELETED)
+    elif len(args) >= 3 and args[1] == "add":
+        ids = _parse_ids(args[2])
+        client.playlist_add(client.get_client(), pid, ids)
+        _confirm(_FMT_ADDED % len(ids))
+    elif len(args) >= 3 and args[1] == "remove":
+        ids = _parse_ids(args[2])
+        client.playlist_remove(client.get_client(), pid, ids)
+        _confirm(_FMT_REMOVED % len(ids))
+    else:
+        extra, flags = _split_flags(args, _PLAYLIST_FLAGS, start=1)
+        _reject_extra(extra)
+        limit = flags.get("--limit", 0)
+        offset = flags.get("--offset", 0)
+        result = client.playlist_tracks(client.get_client(), pid, limit=limit, offset=offset)
+        if use_json:
+            _dump_json(result)
+        else:
+            tracks = result["tracks"]
+            total = result["total"]
+            out = formatters.format_track_list(tracks, start=offset + 1)
+            if total > len(tracks) + offset:
+                out += f"\n\nShowing {offset + 1}-{offset + len(tracks)} of {total} tracks."
+            sys.stdout.write(out + "\n")
+
+
+_CREATE_FLAGS = {"--private": bool, "--desc": str}
+
+
+def _cmd_playlist_create(args: list, use_json: bool):
+    """sp playlist create "name" [--private] [--desc "..."] — args start after "create"."""
+    words, flags = _split_flags(args, _CREATE_FLAGS)
+    if not words:
+        print('Usage: sp playlist create "<name>" [--private] [--desc "..."]', file=sys.stderr)
+        sys.exit(1)
+    name = words[0] if len(words) == 1 else " ".join(words)
+    result = client.playlist_create(
+        client.get_client(), name, public="--private" not in flags, description=flags.get("--desc", ""),
+    )
+    if use_json:
+        _dump_json(result)
+    else:
+        print(f"Created: {formatters.format_playlist(result)}")
+
+
+# --- Library ---
+
+def _print_track_list(result):
+    print(formatters.format_track_list(result))
+
+
+def _numbered(fmt):
+    """Printer for a 1-based numbered list, one fmt(item) per line."""
+    def render(result):
+        _write_lines(f"{i:>3}. {fmt(item)}" for i, item in enumerate(result, 1))
+    return render
+
+
+# sub-command -> (client fetcher, text printer)
+_SAVED_SUBCOMMANDS = {
+    "tracks": (client.saved_tracks, _print_track_list),
+    "albums": (client.saved_albums, _numbered(formatters.format_album)),
+}
+
+
+def _cmd_saved(args: list, use_json: bool):
+    positional, flags = _split_flags(args, _LIMIT_FLAGS)
+    if not positional:
+        print("Usage: sp saved tracks|albums [--limit N]", file=sys.stderr)
+        sys.exit(1)
+    sub = positional[0]
+    op = _SAVED_SUBCOMMANDS.get(sub)
+    if op is None:
+        print(f"Unknown: sp saved {sub}. Use 'tracks' or 'albums'.", file=sys.stderr)
+        sys.exit(1)
+    _reject_extra(positional[1:])
+    fetch, render = op
+    result = fetch(client.get_client(), flags.get("--limit", 20))
+    if use_json:
+        _dump_json(result)
+    else:
+        render(result)
+
+
+_SAVE_OPS = {
+    ("save", "track"): (client.save_tracks, _FMT_SAVED),
+    ("save", "album"): (client.save_albums, _FMT_SAVED_ALBUMS),
+    ("unsave", "track"): (client.unsave_tracks, _FMT_REMOVED),
+    ("unsave", "album"): (client.unsave_albums, _FMT_REMOVED_ALBUMS),
+}
+
+
+def _run_save_op(cmd: str, args: list):
+    if len(args) < 2:
+        print(f"Usage: sp {cmd} track|album <ids>", file=sys.stderr)
+        sys.exit(1)
+    sub = args[0]
+    op = _SAVE_OPS.get((cmd, sub))
+    if op is None:
+        print(f"Unknown: sp {cmd} {sub}. Use 'track' or 'album'.", file=sys.stderr)
+        sys.exit(1)
+    fn, msg = op
+    ids = _parse_ids(args[1])
+    fn(client.get_client(), ids)
+    _confirm(msg % len(ids))
+
+
+def _cmd_save(args: list, use_json: bool):
+    _run_save_op("save", args)
+
+
+def _cmd_unsave(args: list, use_json: bool):
+    _run_save_op("unsave", args)
+
+
+# --- Listening History ---
+
+def _cmd_recent(args: list, use_json: bool):
+    positional, flags = _split_flags(args, _LIMIT_FLAGS)
+    _reject_extra(positional)
+    result = client.recent(client.get_client(), flags.get("--limit", 20))
+    if use_json:
+        _dump_json(result)
+    else:
+        _print_track_list(result)
+
+
+_TOP_SUBCOMMANDS = {
+    "tracks": (client.top_tracks, _print_track_list),
+    "artists": (client.top_artists, _numbered(formatters.format_artist)),
+}
+
+
+def _cmd_top(args: list, use_json: bool):
+    positional, flags = _split_flags(args, _TOP_FLAGS)
+    if not positional:
+        print("Usage: sp top tracks|artists [--range short|medium|long] [--limit N]", file=sys.stderr)
+        sys.exit(1)
+    sub = positional[0]
+    op = _TOP_SUBCOMMANDS.get(sub)
+    if op is None:
+        print(f"Unknown: sp top {sub}. Use 'tracks' or 'artists'.", file=sys.stderr)
+        sys.exit(1)
+    _reject_extra(positional[1:])
+    fetch, render = op
+    result = fetch(client.get_client(), flags.get("--range", "medium_term"), flags.get("--limit", 20))
+    if use_json:
+        _dump_json(result)
+    else:
+        render(result)
+
+
+# --- Batch ---
+
+_RECORD_SEPARATOR = b"\x1e\n"
+
+
+def _cmd_batch(args: list, use_json: bool):
+    """Run one sp command per stdin line in this process, sharing the memoized client.
+
+    Each command's output is followed by a record-separator line. A failing line
+    reports on stderr like a normal run and the batch moves on; the batch exits 1
+    if any line failed. --json on the batch applies to every line.
+    """
+    import shlex
+
+    failed = False
+    for line in sys.stdin:
+        try:
+            # Inside the try: a malformed line (e.g. an unclosed quote) fails on its own
+            tokens = shlex.split(line, comments=True)
+            if not tokens:
+                continue
+            line_json = use_json or "--json" in tokens
+            if "--json" in tokens:
+                tokens = [t for t in tokens if t != "--json"]
+            cmd = tokens[0] if tokens else ""
+            if cmd not in _HANDLERS or cmd == "batch":
+                print(f"Unknown command: {cmd}. Run 'sp help' for usage.", file=sys.stderr)
+                failed = True
+            else:
+                _HANDLERS[cmd](tokens[1:], line_json)
+        except SystemExit as e:
+            # Usage errors call sys.exit(1); missing credentials carry their message
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+            failed = failed or e.code != 0
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            failed = True
+        _confirm(_RECORD_SEPARATOR)
+        sys.stdout.flush()
+    if failed:
+        sys.exit(1)
+
+
+_HANDLERS = {
+    "now": _cmd_now,
+    "play": _cmd_play,
+    "pause": _cmd_pause,
+    "skip": _cmd_skip,
+    "prev": _cmd_prev,
+    "volume": _cmd_volume,
+    "devices": _cmd_devices,
+    "queue": _cmd_queue,
+    "search": _cmd_search,
+    "info": _cmd_info,
+    "playlists": _cmd_playlists,
+    "playlist": _cmd_playlist,
+    "saved": _cmd_saved,
+    "save": _cmd_save,
+    "unsave": _cmd_unsave,
+    "recent": _cmd_recent,
+    "top": _cmd_top,
+    "batch": _cmd_batch,
+}
+
+
+KNOWN_COMMANDS = frozenset(_HANDLERS)
+
+
+def dispatch(cmd: str, args: list, use_json: bool):
+    """Run cmd, which the caller has already checked against KNOWN_COMMANDS.
+
+    Handlers validate their arguments before calling client.get_client(), so a
+    usage error exits without importing spotipy or touching the token cache.
+    """
+    _HANDLERS[cmd](args, use_json)
@@ -1,6 +1,6 @@
-"""Plain text and JSON output formatters."""
+"""Plain text output formatters. JSON output lives in formatters_json."""
 
-import json
+from operator import itemgetter
 from typing import Optional
 
 
@@ -8,26 +8,25 @@ def _artist_str(item: dict) -> str:
     a = item.get("artist")
     if a is None:
         return "Unknown"
-    if isinstance(a, list):
-        return ", ".join(n["name"] if isinstance(n, dict) else n for n in a)
-    if isinstance(a, dict):
+    kind = type(a)
+    if kind is str:
+        return a
+    if kind is list:
+        # parse_* produce homogeneous lists: all names, or all {name, id} dicts
+        if a and isinstance(a[0], dict):
+            return ", ".join(map(itemgetter("name"), a))
+        return ", ".join(a)
+    if kind is dict:
         return a["name"]
     return str(a)
 
 
-def _ms_to_duration(ms: Optional[int]) -> str:
-    if not ms:
-        return ""
-    s = ms // 1000
-    return f"{s // 60}:{s % 60:02d}"
-
-
 def format_track(t: dict) -> str:
-    parts = [f"{t['name']} -- {_artist_str(t)}"]
-    if t.get("duration_ms"):
-        parts.append(f"[{_ms_to_duration(t['duration_ms'])}]")
-    parts.append(f"(ID: {t['id']})")
-    return " ".join(parts)
+    ms = t.get("duration_ms")
+    if ms:
+        s = ms // 1000
+        return f"{t['name']} -- {_artist_str(t)} [{s // 60}:{s % 60:02d}] (ID: {t['id']})"
+    return f"{t['name']} -- {_artist_str(t)} (ID: {t['id']})"
 
 
 def format_now_playing(t: Optional[dict]) -> str:
@@ -40,13 +39,9 @@ def format_now_playing(t: Optional[dict]) -> str:
 def format_track_list(tracks: list, numbered: bool = True, start: int = 1) -> str:
     if not tracks:
         return "No tracks."
-    lines = []
-    for i, t in enumerate(tracks, start):
-        line = format_track(t)
-        if numbered:
-            line = f"{i:>3}. {line}"
-        lines.append(line)
-    return "\n".join(lines)
+    if not numbered:
+        return "\n".join(map(format_track, tracks))
+    return "\n".join(f"{i:>3}. {format_track(t)}" for i, t in enumerate(tracks, start))
 
 
 def format_artist(a: dict) -> str:
@@ -81,20 +76,21 @@ def format_device(d: dict) -> str:
     return f"  {active} {d['name']} ({d['type']}) vol:{d.get('volume_percent', '?')}%"
 
 
+_SEARCH_FORMATTERS = {
+    "tracks": format_track,
+    "artists": format_artist,
+    "albums": format_album,
+    "playlists": format_playlist,
+}
+
+
 def format_search_results(results: dict) -> str:
     lines = []
     for category, items in results.items():
         lines.append(f"--- {category.upper()} ---")
-        for i, item in enumerate(items, 1):
-            match category:
-                case "tracks":
-                    lines.append(f"  {i}. {format_track(item)}")
-                case "artists":
-                    lines.append(f"  {i}. {format_artist(item)}")
-                case "albums":
-                    lines.append(f"  {i}. {format_album(item)}")
-                case "playlists":
-                    lines.append(f"  {i}. {format_playlist(item)}")
+        fmt = _SEARCH_FORMATTERS.get(category)
+        if fmt:
+            lines.extend(f"  {i}. {fmt(item)}" for i, item in enumerate(items, 1))
         lines.append("")
     return "\n".join(lines).rstrip()
 
@@ -112,8 +108,7 @@ def format_queue(q: dict) -> str:
         lines.append("Queue is empty.")
     else:
         lines.append("Queue:")
-        for i, t in enumerate(queue, 1):
-            lines.append(f"  {i}. {format_track(t)}")
+        lines.extend(f"  {i}. {format_track(t)}" for i, t in enumerate(queue, 1))
     return "\n".join(lines)
 
 
@@ -121,12 +116,17 @@ def format_artist_info(a: dict) -> str:
     lines = [format_artist(a)]
     if a.get("top_tracks"):
         lines.append("\nTop Tracks:")
-        for i, t in enumerate(a["top_tracks"], 1):
-            lines.append(f"  {i}. {format_track(t)}")
+        lines.extend(f"  {i}. {format_track(t)}" for i, t in enumerate(a["top_tracks"], 1))
     if a.get("albums"):
         lines.append("\nAlbums:")
-        for i, alb in enumerate(a["albums"], 1):
-            lines.append(f"  {i}. {format_album(alb)}")
+        lines.extend(f"  {i}. {format_album(alb)}" for i, alb in enumerate(a["albums"], 1))
+    return "\n".join(lines)
+
+
+def format_album_detail(a: dict) -> str:
+    lines = [format_album(a)]
+    if a.get("tracks"):
+        lines.extend(f"  {i}. {format_track(t)}" for i, t in enumerate(a["tracks"], 1))
     return "\n".join(lines)
 
 
@@ -136,10 +136,5 @@ def format_playlist_detail(p: dict) -> str:
         lines.append(f"  {p['description']}")
     if p.get("tracks"):
         lines.append("")
-        for i, t in enumerate(p["tracks"], 1):
-            lines.append(f"  {i}. {format_track(t)}")
+        lines.extend(f"  {i}. {format_track(t)}" for i, t in enumerate(p["tracks"], 1))
     return "\n".join(lines)
-
-
-def as_json(data) -> str:
-    return json.dumps(data, indent=2, ensure_ascii=False)
@@ -0,0 +1,30 @@
+"""JSON output — only imported by --json paths."""
+
+import json
+import sys
+
+try:
+    import orjson
+except ImportError:  # optional: pip install spotify-cli[fast]
+    orjson = None
+
+# Built once; json.dump constructs a fresh encoder on every call with non-default options
+_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+
+
+def dump_json(data, fp=None):
+    """Stream JSON to fp (default stdout) without building the whole string first."""
+    fp = fp if fp is not None else sys.stdout
+    if orjson is not None:
+        out = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        buffer = getattr(fp, "buffer", None)
+        if buffer is not None:
+            # Already UTF-8 bytes — skip the text layer's encode step
+            fp.flush()
+            buffer.write(out)
+        else:
+            fp.write(out.decode())
+        return
+    # iterencode yields chunks as it goes, so peak memory stays flat on large exports
+    fp.writelines(_ENCODER.iterencode(data))
+    fp.write("\n")
@@ -0,0 +1,56 @@
+"""HTTP/2 transport for spotipy — opt in with SPOTIFY_CLI_HTTP2=1.
+
+Spotipy only keeps a session that is a `requests.Session`, so the adapter
+subclasses it and overrides `request()`; responses are converted back into
+`requests.Response` objects because that is what spotipy reads.
+"""
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class HTTPXSessionAdapter(requests.Session):
+    """A `requests.Session` whose requests go over one multiplexed httpx client."""
+
+    def __init__(self, timeout: float = 10):
+        super().__init__()
+        # Drop requests' defaults; "Connection: keep-alive" is not allowed over HTTP/2
+        self.headers = CaseInsensitiveDict()
+        transport = httpx.HTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=8),
+            retries=3,  # connection failures only; spotipy surfaces HTTP errors itself
+        )
+        self._client = httpx.Client(transport=transport, timeout=timeout)
+
+    def request(self, method: str, url: str, headers=None, params=None, data=None, json=None,
+                timeout=None, proxies=None, **_) -> requests.Response:
+        merged = {**self.headers, **(headers or {})}
+        # requests drops None-valued params; httpx would send them as "key=" (e.g. market=)
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        kwargs = {"headers": merged, "params": params}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if json is not None:
+            kwargs["json"] = json
+        elif isinstance(data, dict):
+            kwargs["data"] = {k: v for k, v in data.items() if v is not None}
+        elif data is not None:
+            kwargs["content"] = data
+        return _to_requests_response(self._client.request(method, url, **kwargs))
+
+    def close(self):
+        self._client.close()
+        super().close()
+
+
+def _to_requests_response(r: httpx.Response) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = r.status_code
+    resp.headers = CaseInsensitiveDict(r.headers)
+    resp.url = str(r.url)
+    resp.reason = r.reason_phrase
+    resp.encoding = r.encoding
+    resp._content = r.content
+    return resp
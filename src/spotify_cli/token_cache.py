@@ -0,0 +1,30 @@
+"""OAuth token cache that reads the token file once per process."""
+
+from spotipy.cache_handler import CacheFileHandler
+
+from . import cache
+
+
+class MemoizedCacheFileHandler(CacheFileHandler):
+    """CacheFileHandler that keeps the token in memory after the first read.
+
+    SpotifyOAuth asks for the cached token before every API request, so
+    multi-call commands would otherwise re-read and re-parse the file each time.
+    Refreshed tokens are still written through to disk. A token with a new
+    refresh token means a fresh authorization, possibly for another account,
+    so the per-account response cache is cleared.
+    """
+
+    _token_info = None
+
+    def get_cached_token(self):
+        if self._token_info is None:
+            self._token_info = super().get_cached_token()
+        return self._token_info
+
+    def save_token_to_cache(self, token_info):
+        previous = self.get_cached_token()
+        super().save_token_to_cache(token_info)
+        self._token_info = token_info
+        if (previous or {}).get("refresh_token") != token_info.get("refresh_token"):
+            cache.invalidate(*cache.USER_PREFIXES)
@@ -1,22 +1,35 @@
 """Parse functions adapted from spotify-mcp/utils.py — pure functions, no external deps."""
 
-from collections import defaultdict
+from functools import lru_cache
 from typing import Optional, Dict
 from urllib.parse import quote, urlparse, urlunparse
 
 
+@lru_cache(maxsize=8)
 def normalize_redirect_uri(url: str) -> str:
-    if not url:
+    if not url or "localhost" not in url:
         return url
+    # Common scheme://localhost[:port]/... form: swap the host in place
+    host = url.find("://") + 3
+    if host > 2 and url.startswith("localhost", host):
+        rest = url[host + len("localhost"):]
+        if rest[:1] in ("", ":", "/", "?", "#"):
+            return url[:host] + "127.0.0.1" + rest
     parsed = urlparse(url)
     if parsed.netloc == "localhost" or parsed.netloc.startswith("localhost:"):
-        port = ""
-        if ":" in parsed.netloc:
-            port = ":" + parsed.netloc.split(":")[1]
-        parsed = parsed._replace(netloc=f"127.0.0.1{port}")
+        parsed = parsed._replace(netloc="127.0.0.1" + parsed.netloc[len("localhost"):])
     return urlunparse(parsed)
 
 
+def _artist_field(raw: list, detailed: bool):
+    """The "artist" value: names (or parsed artists when detailed), unwrapped if there is only one."""
+    if len(raw) == 1:
+        return parse_artist(raw[0]) if detailed else raw[0]["name"]
+    if detailed:
+        return [parse_artist(a) for a in raw]
+    return [a["name"] for a in raw]
+
+
 def parse_track(track_item: dict, detailed=False) -> Optional[dict]:
     if not track_item:
         return None
@@ -32,10 +45,7 @@ def parse_track(track_item: dict, detailed=False) -> Optional[dict]:
             result[k] = track_item.get(k)
     if not track_item.get("is_playable", True):
         result["is_playable"] = False
-    artists = [a["name"] for a in track_item["artists"]]
-    if detailed:
-        artists = [parse_artist(a) for a in track_item["artists"]]
-    result["artist"] = artists[0] if len(artists) == 1 else artists
+    result["artist"] = _artist_field(track_item["artists"], detailed)
     return result
 
 
@@ -54,16 +64,14 @@ def parse_album(album_item: dict, detailed=False) -> Optional[dict]:
     if not album_item:
         return None
     result = {"name": album_item["name"], "id": album_item["id"]}
-    artists = [a["name"] for a in album_item["artists"]]
     if detailed:
         tracks = []
         for t in album_item.get("tracks", {}).get("items", []):
             tracks.append(parse_track(t))
         result["tracks"] = tracks
-        artists = [parse_artist(a) for a in album_item["artists"]]
         for k in ["total_tracks", "release_date", "genres"]:
             result[k] = album_item.get(k)
-    result["artist"] = artists[0] if len(artists) == 1 else artists
+    result["artist"] = _artist_field(album_item["artists"], detailed)
     return result
 
 
@@ -87,24 +95,27 @@ def parse_playlist(playlist_item: dict, username=None, detailed=False) -> Option
     return result
 
 
+# Search type -> (key in the API response and in our output, parser, parser takes username)
+_SEARCH_DISPATCH = {
+    "track": ("tracks", parse_track, False),
+    "artist": ("artists", parse_artist, False),
+    "playlist": ("playlists", parse_playlist, True),
+    "album": ("albums", parse_album, False),
+}
+
+
 def parse_search_results(results: Dict, qtype: str, username: Optional[str] = None):
-    _results = defaultdict(list)
+    # One (possibly empty) list per requested type, so an empty category is still reported
+    _results = {}
     for q in qtype.split(","):
-        match q:
-            case "track":
-                for item in results["tracks"]["items"]:
-                    if item:
-                        _results["tracks"].append(parse_track(item))
-            case "artist":
-                for item in results["artists"]["items"]:
-                    if item:
-                        _results["artists"].append(parse_artist(item))
-            case "playlist":
-                for item in results["playlists"]["items"]:
-                    if item:
-                        _results["playlists"].append(parse_playlist(item, username))
-            case "album":
-                for item in results["albums"]["items"]:
-                    if item:
-                        _results["albums"].append(parse_album(item))
-    return dict(_results)
+        entry = _SEARCH_DISPATCH.get(q)
+        if entry is None:
+            continue
+        key, parse, wants_username = entry
+        items = results[key]["items"]
+        out = _results.setdefault(key, [])
+        if wants_username:
+            out.extend([parse(item, username) for item in items if item])
+        else:
+            out.extend([parse(item) for item in items if item])
+    return _results